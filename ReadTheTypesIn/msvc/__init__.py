@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import Optional, Iterable
 from enum import Enum, auto
-from collections import defaultdict
 from dataclasses import dataclass
+import traceback
 import binaryninja as bn
-from ..types import RelativeOffsetRenderer, EnumRenderer, RelativeOffsetListener
+from ..types import CheckedTypeDataVar, RelativeOffsetRenderer, EnumRenderer, RelativeOffsetListener
 from ..types.annotation import DisplacementOffset
+from ..utils import bulk_modify_symbols
 from .structs.rtti.type_descriptor import TypeDescriptor
 from .structs.rtti.base_class_descriptor import \
     BaseClassDescriptor, BaseClassArray
@@ -19,6 +20,32 @@ from .structs.eh.scope_table import ScopeTable,  ScopeHandlerRenderer
 from .structs.eh.image_runtime_function import ImageRuntimeFunction
 from .class_info import VisualCxxBaseClass, VisualCxxClass
 
+def mark_down_all(
+    view: bn.BinaryView,
+    instances: Iterable[CheckedTypeDataVar],
+    description: str,
+    task: Optional[bn.BackgroundTask] = None,
+):
+    # Deliberately sequential: the enclosing undoable transaction only
+    # records actions made on this thread, and the per-view instance
+    # pools that mark_down populates are not synchronised
+    if task is not None:
+        task.progress = f'Marking down {description}'
+    # Every mark down (and its members') names a data variable; the symbol
+    # table is updated once for the whole batch
+    with bulk_modify_symbols(view):
+        for instance in instances:
+            # Members may only be built here, so one malformed instance
+            # is skipped rather than aborting the whole search
+            try:
+                instance.mark_down()
+            except ValueError:
+                bn.log.log_warn(
+                    f'Failed to mark down {description} @ 0x{instance.address:x}',
+                    'mark_down_all',
+                )
+                bn.log.log_debug(traceback.format_exc(), 'mark_down_all')
+
 def register_renderers():
     ScopeHandlerRenderer().register_type_specific()
     UnwindMapRenderer().register_type_specific()
@@ -28,34 +55,36 @@ def register_renderers():
 
 # TODO: refactor this to allow start from any phase (i.e. from saved file, or manually defined)
 def search_rtti(view: bn.BinaryView, task: Optional[bn.BackgroundTask] = None):
-    type_descs = list(TypeDescriptor.search(view, task=task))
+    # Only descriptors found by this search, not the whole per-view pool,
+    # which also holds ones created by earlier runs or other searches
+    found_type_descs = {}
+    def record_type_descriptors():
+        for type_desc in TypeDescriptor.search(view, task=task):
+            found_type_descs[type_desc.address] = type_desc
+            yield type_desc
+
     complete_object_locators = list(
         CompleteObjectLocator.search_with_type_descriptors(
             view,
-            type_descs,
+            record_type_descriptors(),
             task=task,
         )
     )
 
-    if task is not None:
-        task.progress = 'Marking down complete object locators'
+    mark_down_all(view, complete_object_locators, 'complete object locators', task)
     for col in complete_object_locators:
-        col.mark_down()
-
-    undefined_type_descs = set(
-        type_desc
-        for type_desc in type_descs
-        if not type_desc.defined
-    ) - set(
-        col.type_descriptor
-        for col in complete_object_locators
-    )
+        found_type_descs.pop(col.type_descriptor.address, None)
 
-    if task is not None:
-        task.progress = 'Marking down remaining type descriptors'
-    for type_desc in undefined_type_descs:
-        type_desc.mark_down()
+    undefined_type_descs = [
+        found_type_descs[address]
+        for address in sorted(found_type_descs)
+        if not found_type_descs[address].defined
+    ]
 
+    mark_down_all(view, undefined_type_descs, 'remaining type descriptors', task)
+
+    # Descriptors are pooled per address and hash by identity, so keying on
+    # them is as cheap as keying on id()
     classes = {
         chd: VisualCxxClass(chd) for chd in ClassHierarchyDescriptor.get_instances(view)
     }
@@ -66,16 +95,14 @@ def search_rtti(view: bn.BinaryView, task: Optional[bn.BackgroundTask] = None):
         task=task
     ))
 
-    referenced_cols = set(
-        vft.meta
-        for vft in virtual_function_tables
-    )
-    ureferenced_cols = set(complete_object_locators) - referenced_cols
-    for col in ureferenced_cols:
-        bn.log.log_warn(f"{repr(col)} unreferenced")
-
+    unreferenced_cols = set(complete_object_locators)
     for vftable in virtual_function_tables:
-        classes[vftable.meta.class_hierarchy_descriptor].add_vftable(vftable)
+        col = vftable.meta
+        unreferenced_cols.discard(col)
+        classes[col.class_hierarchy_descriptor].add_vftable(vftable)
+
+    for col in unreferenced_cols:
+        bn.log.log_warn(f"{repr(col)} unreferenced")
 
     return list(classes.values())
 
@@ -90,37 +117,34 @@ class MSVCExceptionPersonality(Enum):
 
     GS_EH = auto()
 
-def resolve_personality(handler: bn.Function) -> MSVCExceptionPersonality:
-    if handler.name == '__C_specific_handler':
-        return MSVCExceptionPersonality.C_SPECIFIC
-
-    if handler.name == '__GSHandlerCheck':
-        return MSVCExceptionPersonality.GS
-
-    if handler.name == '__GSHandlerCheck_SEH':
-        return MSVCExceptionPersonality.GS_SEH
-
-    if handler.name in [
-        '__CxxFrameHandler',
-        '__CxxFrameHandler3',
-        '__CxxFrameHandler4',
-    ]:
-        return MSVCExceptionPersonality.CXX_FRAME
+_PERSONALITY_BY_NAME = {
+    '__C_specific_handler': MSVCExceptionPersonality.C_SPECIFIC,
+    '__GSHandlerCheck': MSVCExceptionPersonality.GS,
+    '__GSHandlerCheck_SEH': MSVCExceptionPersonality.GS_SEH,
+    '__CxxFrameHandler': MSVCExceptionPersonality.CXX_FRAME,
+    '__CxxFrameHandler3': MSVCExceptionPersonality.CXX_FRAME,
+    '__CxxFrameHandler4': MSVCExceptionPersonality.CXX_FRAME,
+    '__GSHandlerCheck_EH': MSVCExceptionPersonality.GS_EH,
+}
 
-    if handler.name == '__GSHandlerCheck_EH':
-        return MSVCExceptionPersonality.GS_EH
-
-    if any(
-        callee.name == '__GSHandlerCheckCommon'
-        for callee in handler.callees
-    ) and any(
-        callee.name.startswith('__CxxFrameHandler')
-        for callee in handler.callees
-    ):
-        if any(
-            callee.name == '__CxxFrameHandler4'
-            for callee in handler.callees
-        ):
+def resolve_personality(handler: bn.Function) -> MSVCExceptionPersonality:
+    if (personality := _PERSONALITY_BY_NAME.get(handler.name)) is not None:
+        return personality
+
+    calls_gs_check = False
+    calls_cxx_frame_handler = False
+    calls_cxx_frame_handler4 = False
+    for callee in handler.callees:
+        name = callee.name
+        if name == '__GSHandlerCheckCommon':
+            calls_gs_check = True
+        elif name.startswith('__CxxFrameHandler'):
+            calls_cxx_frame_handler = True
+            if name == '__CxxFrameHandler4':
+                calls_cxx_frame_handler4 = True
+
+    if calls_gs_check and calls_cxx_frame_handler:
+        if calls_cxx_frame_handler4:
             handler.name = '__GSHandlerCheck_EH4'
         else:
             handler.name = '__GSHandlerCheck_EH'
@@ -141,9 +165,9 @@ def parse_eh64(
     func_infos: list,
     task: Optional[bn.BackgroundTask] = None,
 ):
-    func_info_offsets = set(
-        DisplacementOffset.encode_offset(view, fi.address)
-        for fi in func_infos
+    func_info_offsets = DisplacementOffset.encode_offset_bulk(
+        view,
+        (fi.address for fi in func_infos),
     )
 
     image_runtime_funcs = list(ImageRuntimeFunction.search(
@@ -162,54 +186,68 @@ def parse_eh64(
 
     new_func_infos = []
     c_specific_tables = []
+    view_start = view.start
+    read_int = view.read_int
+    define_user_data_var = view.define_user_data_var
+    disp_type = bn.Type.int(4, False, 'int __disp')
+    cookie_offset_type = bn.Type.int(4, False)
+    func_info_personalities = (
+        MSVCExceptionPersonality.GS_EH,
+        MSVCExceptionPersonality.CXX_FRAME,
+    )
+    scope_table_personalities = (
+        MSVCExceptionPersonality.GS_SEH,
+        MSVCExceptionPersonality.C_SPECIFIC,
+    )
     total = len(image_runtime_funcs)
-    for i, irf in enumerate(image_runtime_funcs):
-        if task is not None:
-            task.progress = f"Processing Image Runtime Function ({i}/{total})"
-
-        unwind_info = irf.unwind_info
-        personality = exception_handlers.get(unwind_info.exception_handler)
-        if personality is None:
-            continue
-
-        data_start = unwind_info.exception_handler_data_start
-        if personality in [MSVCExceptionPersonality.GS_EH, MSVCExceptionPersonality.CXX_FRAME]:
-            view.define_user_data_var(
-                data_start,
-                bn.Type.int(4, False, 'int __disp'),
-                f"pFuncInfo_{data_start:x}"
-            )
-            if personality == MSVCExceptionPersonality.GS_EH:
-                view.define_user_data_var(
-                    data_start + 4,
-                    bn.Type.int(4, False),
-                    f"GSCookieOffset_{data_start + 4:x}"
-                )
-
-            offset = view.read_int(data_start, 4, False)
-            if offset in func_info_offsets:
+    with bulk_modify_symbols(view):
+        for i, irf in enumerate(image_runtime_funcs):
+            if task is not None and (i & 0xFF) == 0:
+                task.progress = f"Processing Image Runtime Function ({i}/{total})"
+
+            unwind_info = irf.unwind_info
+            personality = exception_handlers.get(unwind_info.exception_handler)
+            if personality is None:
                 continue
 
-            func_info_address = view.start + offset
-            fi = FuncInfo4.create(view, func_info_address)
-            fi.mark_down()
-            new_func_infos.append(fi)
-        elif personality == MSVCExceptionPersonality.GS:
-            view.define_user_data_var(
-                data_start,
-                bn.Type.int(4, False),
-                f"GSCookieOffset_{data_start:x}"
-            )
-        elif personality in [MSVCExceptionPersonality.GS_SEH, MSVCExceptionPersonality.C_SPECIFIC]:
-            st = ScopeTable.create(view, data_start)
-            st.mark_down()
-            c_specific_tables.append(st)
-            if personality == MSVCExceptionPersonality.GS_SEH:
-                view.define_user_data_var(
-                    data_start + st.type.width,
-                    bn.Type.int(4, False),
-                    f"GSCookieOffset_{data_start + st.type.width:x}"
+            data_start = unwind_info.exception_handler_data_start
+            if personality in func_info_personalities:
+                define_user_data_var(
+                    data_start,
+                    disp_type,
+                    f"pFuncInfo_{data_start:x}"
                 )
+                if personality == MSVCExceptionPersonality.GS_EH:
+                    define_user_data_var(
+                        data_start + 4,
+                        cookie_offset_type,
+                        f"GSCookieOffset_{data_start + 4:x}"
+                    )
+
+                offset = read_int(data_start, 4, False)
+                if offset in func_info_offsets:
+                    continue
+
+                func_info_address = view_start + offset
+                fi = FuncInfo4.create(view, func_info_address)
+                fi.mark_down()
+                new_func_infos.append(fi)
+            elif personality == MSVCExceptionPersonality.GS:
+                define_user_data_var(
+                    data_start,
+                    cookie_offset_type,
+                    f"GSCookieOffset_{data_start:x}"
+                )
+            elif personality in scope_table_personalities:
+                st = ScopeTable.create(view, data_start)
+                st.mark_down()
+                c_specific_tables.append(st)
+                if personality == MSVCExceptionPersonality.GS_SEH:
+                    define_user_data_var(
+                        data_start + st.type.width,
+                        cookie_offset_type,
+                        f"GSCookieOffset_{data_start + st.type.width:x}"
+                    )
 
 def search_eh(
     view: bn.BinaryView,
@@ -221,10 +259,7 @@ def search_eh(
         task,
     ))
 
-    if task is not None:
-        task.progress = 'Marking down catchable types'
-    for ct in catchable_types:
-        ct.mark_down()
+    mark_down_all(view, catchable_types, 'catchable types', task)
 
     catchable_type_arrays = list(CatchableTypeArray.search(
         view,
@@ -232,10 +267,7 @@ def search_eh(
         task
     ))
 
-    if task is not None:
-        task.progress = 'Marking down catchable type arrays'
-    for cta in catchable_type_arrays:
-        cta.mark_down()
+    mark_down_all(view, catchable_type_arrays, 'catchable type arrays', task)
 
     throw_infos = list(ThrowInfo.search_with_catchable_type_arrays(
         view,
@@ -243,20 +275,14 @@ def search_eh(
         task
     ))
 
-    if task is not None:
-        task.progress = 'Marking down throw infos'
-    for throw_info in throw_infos:
-        throw_info.mark_down()
+    mark_down_all(view, throw_infos, 'throw infos', task)
 
     func_infos = list(FuncInfo.search(
         view,
         task,
     ))
 
-    if task is not None:
-        task.progress = 'Marking down func infos'
-    for func_info in func_infos:
-        func_info.mark_down()
+    mark_down_all(view, func_infos, 'func infos', task)
 
     if view.arch.address_size == 8:
         exception_infos = parse_eh64(view, func_infos, task)
@@ -275,7 +301,7 @@ def search_new_and_delete(
     if len(potential_operator_deletes) == 0:
         raise ValueError("Cannot find `operator delete'")
 
-    return potential_operator_news, potential_operator_deletes
+    return set(potential_operator_news), set(potential_operator_deletes)
 
 def search_structors(
     view: bn.BinaryView,
@@ -285,36 +311,44 @@ def search_structors(
     if task is not None:
         task.progress = 'Identifying structors'
 
-    vftable_refs_mapping = {
-        ref: vft
-        for cls in classes
-        for vft in cls.base_vftables.values()
-        for ref in view.get_code_refs(vft.address)
-    }
-
     operator_news, operator_deletes = search_new_and_delete(view)
 
-    virtual_method_mapping = {
-        method: (cls, offsets)
+    # Binary Ninja has no multi-target xref query, so issue exactly one
+    # lookup per distinct vftable, in address order
+    vftables = {
+        vft.address: vft
         for cls in classes
-        for offsets, vft in cls.base_vftables.items()
+        for vft in cls.base_vftables.values()
+    }
+    virtual_methods = set(
+        method
+        for vft in vftables.values()
         for address in vft.method_addresses
         if (method := view.get_function_at(address)) is not None
-    }
+    )
 
-    functions_to_refs = defaultdict(list)
-    for ref, vft in vftable_refs_mapping.items():
-        functions_to_refs[ref.function].append(ref)
+    functions_to_refs = {}
+    for address in sorted(vftables):
+        vft = vftables[address]
+        for ref in view.get_code_refs(address):
+            functions_to_refs.setdefault(ref.function, []).append((ref, vft))
+
+    callers_of_new = set(
+        site.function
+        for new in operator_news
+        for site in new.caller_sites
+    )
 
     # TODO(WPO) map, from functions_to_refs, potential_direct_structors to their this arg
-    constructors = {}
+    constructors: set[bn.Function] = set()
     for function, refs in functions_to_refs.items():
-        if function in virtual_method_mapping:
+        if function in virtual_methods:
             continue
 
-        potential_sizes = []
+        allocation_size = None
+        consistent_size = True
         for site in function.caller_sites:
-            if not any(new in site.function.callees for new in operator_news):
+            if site.function not in callers_of_new:
                 continue
 
             constructor_call = site.hlil
@@ -356,20 +390,18 @@ def search_structors(
             if not isinstance(size, bn.HighLevelILConst):
                 continue
 
-            potential_sizes.append(size.constant)
-
-        if len(potential_sizes) == 0:
-            continue
+            if allocation_size is None:
+                allocation_size = size.constant
+            elif size.constant != allocation_size:
+                consistent_size = False
+                break
 
-        if not all(
-            size == potential_sizes[0]
-            for size in potential_sizes
-        ):
+        if allocation_size is None or not consistent_size:
             continue
 
         # TODO identify target class via last assignment to `this` ptr
 
-        constructors[function] = True
+        constructors.add(function)
 
     for func in constructors:
         # TODO attribute vftable
@@ -399,27 +431,25 @@ def search(view: bn.BinaryView, task: Optional[bn.BackgroundTask] = None):
             "ReadTheTypesIn::search",
         )
 
-    resolved_classes = VisualCxxClass.structure(classes, task)
-    with view.undoable_transaction():
+        resolved_classes = VisualCxxClass.structure(classes, task)
+
         # TODO TEMPORARY
-        for cls in classes:
-            for vft in cls.base_vftables.values():
-                if task is not None:
-                    try:
-                        task.progress = f"Marking down {vft.address} for {cls}"
-                    except:
-                        pass
+        vftables = [
+            vft
+            for cls in classes
+            for vft in cls.base_vftables.values()
+        ]
+        with bulk_modify_symbols(view):
+            for i, vft in enumerate(vftables):
+                if task is not None and (i & 0xFF) == 0:
+                    task.progress = f"Marking down vftable {i}/{len(vftables)}"
                 address = vft.address - view.address_size
                 view.define_user_data_var(address, vft.type, vft.name())
 
-        for cls in resolved_classes:
-            try:
-                bn.log.log_info(
-                    cls,
-                    "ReadTheTypesIn::search",
-                )
-            except:
-                pass
+        bn.log.log_info(
+            f"{len(resolved_classes)} classes structured",
+            "ReadTheTypesIn::search",
+        )
         constructors = search_structors(view, classes, task)
         bn.log.log_info(
             f"{len(constructors)} constructors identified",
@@ -1,6 +1,9 @@
 from typing import Optional
+from bisect import bisect_left
+from collections import defaultdict, deque
 from dataclasses import dataclass
 import binaryninja as bn
+from .structs.rtti.type_descriptor import TypeDescriptor
 from .structs.rtti.base_class_descriptor import BaseClassDescriptor
 from .structs.rtti.class_hierarchy_descriptor import ClassHierarchyDescriptor
 from .structs.virtual_function_table import VirtualFunctionTable
@@ -10,6 +13,89 @@ class VisualCxxBaseClass:
     cls: 'VisualCxxClass'
     base_class_descriptor: BaseClassDescriptor
 
+BaseClassPositions = tuple[
+    dict[ClassHierarchyDescriptor, list[int]],
+    dict[TypeDescriptor, list[int]],
+    dict[TypeDescriptor, list[int]],
+]
+
+def _index_base_class_array(bcds: tuple[BaseClassDescriptor, ...]) -> BaseClassPositions:
+    # Bases without a class hierarchy descriptor only ever match by type descriptor
+    chd_positions = defaultdict(list)
+    td_positions = defaultdict(list)
+    td_only_positions = defaultdict(list)
+    for i, bcd in enumerate(bcds):
+        td_positions[bcd.type_descriptor].append(i)
+        if (chd := bcd.class_hierarchy_descriptor) is not None:
+            chd_positions[chd].append(i)
+        else:
+            td_only_positions[bcd.type_descriptor].append(i)
+
+    return chd_positions, td_positions, td_only_positions
+
+def _find_base_index(
+    positions: BaseClassPositions,
+    ancestor_bcd: BaseClassDescriptor,
+    start: int,
+) -> int:
+    chd_positions, td_positions, td_only_positions = positions
+    ancestor_td = ancestor_bcd.type_descriptor
+    if (ancestor_chd := ancestor_bcd.class_hierarchy_descriptor) is None:
+        candidates = [td_positions.get(ancestor_td, [])]
+    else:
+        candidates = [
+            chd_positions.get(ancestor_chd, []),
+            td_only_positions.get(ancestor_td, []),
+        ]
+
+    matches = [
+        indexes[i]
+        for indexes in candidates
+        if (i := bisect_left(indexes, start)) < len(indexes)
+    ]
+    if len(matches) == 0:
+        raise ValueError(f'Base {ancestor_td.type_name} not found in base class array')
+
+    return min(matches)
+
+def _resolve_base_classes(
+    class_bcds: tuple[BaseClassDescriptor, ...],
+    bcd_to_classes: dict[BaseClassDescriptor, 'VisualCxxClass'],
+    bcds_of: dict['VisualCxxClass', tuple[BaseClassDescriptor, ...]],
+) -> list[VisualCxxBaseClass]:
+    positions = _index_base_class_array(class_bcds)
+
+    base_classes = []
+    resolved_indexes = [None] * len(class_bcds)
+    # Slots before the cursor are always resolved, so the search for the
+    # next direct base never has to restart from the beginning
+    cursor = 0
+    while True:
+        while cursor < len(resolved_indexes) and resolved_indexes[cursor] is not None:
+            cursor += 1
+        if cursor == len(resolved_indexes):
+            break
+
+        parent_bca_index = cursor
+        parent_bcd = class_bcds[parent_bca_index]
+        parent_class = bcd_to_classes[parent_bcd]
+        resolved_indexes[parent_bca_index] = parent_class
+
+        ancestor_bcds = bcds_of[parent_class]
+
+        parent_bca_index += 1
+        for ancestor_bcd in ancestor_bcds:
+            parent_bca_index = _find_base_index(positions, ancestor_bcd, parent_bca_index)
+            resolved_indexes[parent_bca_index] = bcd_to_classes[ancestor_bcd]
+            parent_bca_index += 1
+
+        base_classes.append(VisualCxxBaseClass(parent_class, parent_bcd))
+
+    if any(index is None for index in resolved_indexes):
+        raise ValueError('Base class array has unmatched entries')
+
+    return base_classes
+
 class VisualCxxClass:
     class_hierarchy_descriptor: ClassHierarchyDescriptor
     base_vftables: dict[(int, int), VirtualFunctionTable]
@@ -95,88 +181,85 @@ class VisualCxxClass:
         if task is not None:
             task.progress = 'Structuring classes'
 
-        type_names = {
-            cls.type_name: cls
+        chd_to_classes = {
+            cls.class_hierarchy_descriptor: cls
             for cls in classes
         }
-        bcd_to_classes = {
-            bcd: type_names[bcd.type_name]
+        bca_of = {
+            cls: tuple(cls.class_hierarchy_descriptor.base_class_array)
             for cls in classes
-            for bcd in cls.class_hierarchy_descriptor.base_class_array
         }
-
-        resolved = set()
-        changed = False
-        while True:
-            for cls in classes:
-                if cls in resolved:
+        # Base class descriptors lacking BCD_HASPCHD are matched on the
+        # decorated name, which names the type as well as the demangled
+        # type_name does but hashes as a plain string
+        decorated_names = None
+        bcd_to_classes = {}
+        for cls in classes:
+            for bcd in bca_of[cls]:
+                if (chd := bcd.class_hierarchy_descriptor) is not None:
+                    bcd_to_classes[bcd] = chd_to_classes[chd]
                     continue
 
-                class_bcds = list(
-                    cls.class_hierarchy_descriptor.base_class_array
-                )[1:]
-                if not all(
-                    bcd_to_classes[bcd] in resolved
-                    for bcd in class_bcds
-                ):
-                    continue
+                if decorated_names is None:
+                    decorated_names = {
+                        bca_of[named][0].type_descriptor.decorated_name: named
+                        for named in classes
+                    }
+                bcd_to_classes[bcd] = decorated_names[bcd.type_descriptor.decorated_name]
+
+        bcds_of = {
+            cls: bca[1:]
+            for cls, bca in bca_of.items()
+        }
 
-                if task is not None:
-                    task.progress = f'Structuring {cls.type_name}'
-
-                base_classes = []
-                resolved_indexes = [None] * len(class_bcds)
-                while True:
-                    parent_bca_index = next(
-                        (
-                            i
-                            for i, resolved in enumerate(resolved_indexes)
-                            if resolved is None
-                        ),
-                        None,
-                    )
-                    if parent_bca_index is None:
-                        break
-
-                    parent_bcd = class_bcds[parent_bca_index]
-                    parent_class = bcd_to_classes[parent_bcd]
-                    resolved_indexes[parent_bca_index] = parent_class
-
-                    ancestor_bcds = list(
-                        parent_class.class_hierarchy_descriptor.base_class_array
-                    )[1:]
-
-                    parent_bca_index += 1
-                    for ancestor_bcd in ancestor_bcds:
-                        ancestor_chd = ancestor_bcd.class_hierarchy_descriptor
-                        ancestor_td = ancestor_bcd.type_descriptor
-                        for next_parent_bca_offset in range(parent_bca_index, len(class_bcds)):
-                            current = class_bcds[next_parent_bca_offset]
-                            current_chd = current.class_hierarchy_descriptor
-                            current_td = current.type_descriptor
-                            if ancestor_chd is not None and current_chd is not None:
-                                if ancestor_chd is not current_chd:
-                                    continue
-                            elif ancestor_td is not current_td:
-                                continue
-
-                            break
-
-                        parent_bca_index = next_parent_bca_offset
-                        resolved_indexes[parent_bca_index] = bcd_to_classes[ancestor_bcd]
-                        parent_bca_index += 1
-
-                    base_classes.append(VisualCxxBaseClass(parent_class, parent_bcd))
-
-                if any(index is None for index in resolved_indexes):
-                    raise ValueError()
-
-                changed = True
-                cls.base_classes = base_classes
-                resolved.add(cls)
-
-            if not changed:
-                break
-            changed = False
+        unresolved_count = {}
+        dependents = defaultdict(list)
+        for cls in classes:
+            cls_dependencies = set(bcd_to_classes[bcd] for bcd in bcds_of[cls])
+            unresolved_count[cls] = len(cls_dependencies)
+            for dependency in cls_dependencies:
+                dependents[dependency].append(cls)
+
+        ready = deque(
+            cls
+            for cls, count in unresolved_count.items()
+            if count == 0
+        )
+        resolved = set()
+        while len(ready) > 0:
+            cls = ready.popleft()
+            class_bcds = bcds_of[cls]
+
+            if task is not None and (len(resolved) & 0xFF) == 0:
+                task.progress = f'Structuring classes ({len(resolved)}/{len(classes)})'
+
+            try:
+                base_classes = _resolve_base_classes(class_bcds, bcd_to_classes, bcds_of)
+            except ValueError as e:
+                # Left unresolved, so its dependents are skipped with it
+                bn.log.log_warn(
+                    f"Could not structure class {cls.type_name}: {e}",
+                    "VisualCxxClass::structure",
+                )
+                continue
+
+            cls.base_classes = base_classes
+            resolved.add(cls)
+
+            for dependent in dependents[cls]:
+                unresolved_count[dependent] -= 1
+                if unresolved_count[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(resolved) != len(classes):
+            unresolved = ", ".join(
+                str(cls.type_name)
+                for cls in classes
+                if cls not in resolved
+            )
+            bn.log.log_warn(
+                f"Could not structure classes with circular or unresolved bases: {unresolved}",
+                "VisualCxxClass::structure",
+            )
 
         return resolved
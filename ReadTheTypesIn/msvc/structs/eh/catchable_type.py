@@ -1,9 +1,12 @@
 from typing import Optional, Generator, Self, Annotated
+from functools import cached_property
 from enum import IntFlag
 import traceback
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, Array, Enum, RTTIRelative
-from ....utils import get_data_sections, get_function
+from ....utils import \
+    get_data_sections, find_any_data_in_sections, filter_function_targets, unpack_offsets, \
+    get_high_byte_patterns
 from ..rtti.type_descriptor import TypeDescriptor
 from ..rtti.base_class_descriptor import PMD
 
@@ -36,11 +39,11 @@ class CatchableType(CheckedTypeDataVar,
     size_or_offset: Annotated[int, 'sizeOrOffset']
     copy_function: Annotated[bn.Function, 'copyFunction']
 
-    @property
+    @cached_property
     def type_name(self):
         return self.type_descriptor.type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -53,64 +56,60 @@ class CatchableType(CheckedTypeDataVar,
         type_descriptors: list[TypeDescriptor],
         task: Optional[bn.BackgroundTask] = None
     ) -> Generator[Self, None, None]:
-        type_desc_offsets = set(
-            RTTIRelative.encode_offset(
-                view,
-                type_desc.address
-            )
-            for type_desc in type_descriptors
+        type_desc_offsets = RTTIRelative.encode_offset_bulk(
+            view,
+            (type_desc.address for type_desc in type_descriptors),
         )
+        if len(type_desc_offsets) == 0:
+            return
+
+        rtti_base = RTTIRelative.resolve_offset(view, 0)
 
         user_struct = cls.get_structure(view)
         ptype_offset = user_struct['pType'].offset
+        ptype_width = user_struct['pType'].type.width
+        copy_function_offset = user_struct['copyFunction'].offset
+        copy_function_width = user_struct['copyFunction'].type.width
+        align_mask = cls.get_alignment(view) - 1
+        read_int = view.read_int
 
-        matches = []
+        candidates = []
         def update_progress(processed: int, total: int) -> bool:
             task.progress = f'{cls.name} search {processed:x}/{total:x}'
             return not task.cancelled
 
-        def is_potential_catchable_type(accessor: bn.TypedDataAccessor) -> bool:
-            if accessor.address % cls.get_alignment(view) != 0:
-                return False
+        def process_match(address: int, _: bytes) -> bool:
+            address -= PATTERN_SHIFT_SIZE
+            if (address - ptype_offset) & align_mask:
+                return True
 
-            offset = accessor['pType'].value
-            if offset not in type_desc_offsets:
-                return False
-
-            if get_function(
-                view,
-                RTTIRelative.resolve_offset(
-                    view,
-                    accessor['copyFunction'].value,
-                )
-            ) is None:
-                return False
+            # The pattern only covers the high bytes of the offset
+            if read_int(address, ptype_width, False) in type_desc_offsets:
+                candidates.append(address - ptype_offset)
 
             return True
 
-        def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
-            address -= PATTERN_SHIFT_SIZE
-            accessor = view.typed_data_accessor(address - ptype_offset, user_struct)
-            if is_potential_catchable_type(accessor):
-                matches.append(accessor)
-
-            return True
+        patterns = get_high_byte_patterns(
+            view, type_desc_offsets,
+            view.address_size, PATTERN_SHIFT_SIZE,
+        )
 
-        patterns = set(
-            (address >> (8 * PATTERN_SHIFT_SIZE)).to_bytes(
-                view.address_size - PATTERN_SHIFT_SIZE,
-                'little' if view.endianness is bn.Endianness.LittleEndian else 'big')
-            for address in type_desc_offsets
+        find_any_data_in_sections(
+            view, get_data_sections(view),
+            patterns,
+            progress_func=update_progress if task is not None else None,
+            match_callback=process_match,
         )
 
-        for pattern in patterns:
-            for section in get_data_sections(view):
-                view.find_all_data(
-                    section.start, section.end,
-                    pattern,
-                    progress_func=update_progress if task is not None else None,
-                    match_callback=process_match,
-                )
+        matches = [
+            view.typed_data_accessor(address, user_struct)
+            for address in filter_function_targets(
+                view, candidates,
+                lambda address: rtti_base + read_int(
+                    address + copy_function_offset, copy_function_width, False
+                ),
+            )
+        ]
 
         for accessor in matches:
             try:
@@ -166,11 +165,11 @@ class CatchableTypeArray(CheckedTypeDataVar,
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def type_name(self):
         return self[0].type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -188,86 +187,98 @@ class CatchableTypeArray(CheckedTypeDataVar,
         catchable_types: list[CatchableType],
         task: Optional[bn.BackgroundTask] = None
     ) -> Generator[Self, None, None]:
-        ct_offsets = set(
-            RTTIRelative.encode_offset(
-                view,
-                ct.address
-            )
-            for ct in catchable_types
+        ct_offsets = RTTIRelative.encode_offset_bulk(
+            view,
+            (ct.address for ct in catchable_types),
         )
+        if len(ct_offsets) == 0:
+            return
+
+        rtti_base = RTTIRelative.resolve_offset(view, 0)
 
         user_struct = cls.get_structure(view)
         count_type = user_struct['nCatchableTypes'].type
         pointer_type = user_struct['arrayOfCatchableTypes'].type.children[0]
+        read_int = view.read_int
 
         elements = []
         def update_progress(processed: int, total: int) -> bool:
             task.progress = f'{cls.name} search {processed:x}/{total:x}'
             return not task.cancelled
 
-        def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
+        def process_match(address: int, _: bytes) -> bool:
             address -= PATTERN_SHIFT_SIZE
-            accessor = view.typed_data_accessor(
-                address,
-                pointer_type,
-            )
-            if accessor.value in ct_offsets:
+            if read_int(address, pointer_type.width, False) in ct_offsets:
                 elements.append(address)
 
             return True
 
-        patterns = set(
-            (offset >> (8 * PATTERN_SHIFT_SIZE)).to_bytes(
-                pointer_type.width - PATTERN_SHIFT_SIZE,
-                'little' if view.endianness is bn.Endianness.LittleEndian else 'big')
-            for offset in ct_offsets
+        patterns = get_high_byte_patterns(
+            view, ct_offsets,
+            pointer_type.width, PATTERN_SHIFT_SIZE,
         )
 
-        for pattern in patterns:
-            for section in get_data_sections(view):
-                view.find_all_data(
-                    section.start, section.end,
-                    pattern,
-                    progress_func=update_progress if task is not None else None,
-                    match_callback=process_match,
-                )
+        find_any_data_in_sections(
+            view, get_data_sections(view),
+            patterns,
+            progress_func=update_progress if task is not None else None,
+            match_callback=process_match,
+        )
 
-        starts = set()
-        for element in sorted(elements, reverse=True):
-            starts.add(element)
+        # Contiguous runs of known catchable type offsets; each run's start is
+        # a candidate array, and entries inside the run need no revalidation.
+        # Overlapping scan chunks or sections can report an address twice
+        runs = []
+        for element in sorted(set(elements)):
+            if len(runs) > 0:
+                run_start, run_length = runs[-1]
+                if element == run_start + pointer_type.width * run_length:
+                    runs[-1] = (run_start, run_length + 1)
+                    continue
 
-            after = element + pointer_type.width
-            if after in starts:
-                starts.remove(after)
+            runs.append((element, 1))
 
         arrays = []
-        for start in starts:
+        # Offsets probed with create() while validating are remembered either
+        # way, so an offset shared by several arrays is only probed once
+        known_ct_offsets = set(ct_offsets)
+        invalid_ct_offsets = set()
+        for start, run_length in runs:
             try:
                 struct_address = start - count_type.width
-                count = view.typed_data_accessor(
-                    struct_address,
-                    count_type
-                ).value
+                count = read_int(struct_address, count_type.width, True)
                 if count <= 0:
                     continue
 
-                for address in range(
-                    start,
-                    start + (pointer_type.width * count),
-                    pointer_type.width
-                ):
-                    offset = view.typed_data_accessor(
-                        address,
-                        pointer_type,
-                    ).value
-                    if offset not in ct_offsets:
+                # Entries inside the run are known; read the rest in one go
+                remaining_start = start + (pointer_type.width * run_length)
+                remaining_size = pointer_type.width * max(count - run_length, 0)
+                if remaining_start + remaining_size > view.end:
+                    continue
+
+                remaining = view.read(remaining_start, remaining_size)
+                if len(remaining) != remaining_size:
+                    continue
+
+                entries = unpack_offsets(view, remaining, pointer_type.width)
+                # Most arrays only reference known catchable types; test the
+                # whole array at once before probing entries one by one
+                if known_ct_offsets.issuperset(entries):
+                    arrays.append(struct_address)
+                    continue
+
+                for offset in entries:
+                    if offset in invalid_ct_offsets:
+                        break
+
+                    if offset not in known_ct_offsets:
                         try:
-                            CatchableType.create(
-                                view,
-                                RTTIRelative.resolve_offset(view, offset)
-                            )
+                            CatchableType.create(view, rtti_base + offset)
                         except ValueError:
+                            invalid_ct_offsets.add(offset)
                             break
+
+                        known_ct_offsets.add(offset)
                 else:
                     arrays.append(struct_address)
 
@@ -1,8 +1,9 @@
 from typing import Optional, Generator, Self, Annotated
+from functools import cached_property
 import traceback
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, CheckedTypedef, EHRelative
-from ....utils import get_data_sections
+from ....utils import get_data_sections, find_any_data_in_sections, get_offset_struct
 from .handler_type import HandlerType
 
 class UnwindMapEntry(CheckedTypeDataVar, members=[
@@ -28,17 +29,20 @@ class TryBlockMapEntry(CheckedTypeDataVar, members=[
     try_low: Annotated[int, 'tryLow']
     try_high: Annotated[int, 'tryHigh']
     catch_high: Annotated[int, 'catchHigh']
-    handlers: Annotated[list[HandlerType], 'pHandlerArray']
+
+    @cached_property
+    def handler_array_address(self) -> int:
+        return EHRelative.resolve_offset(self.view, self.source['pHandlerArray'].value)
+
+    @cached_property
+    def handlers(self) -> list[HandlerType]:
+        return self['pHandlerArray']
 
     def __getitem__(self, key: str):
         if key == 'pHandlerArray':
             handler_type_width = HandlerType.get_structure(self.view).width
-            handler_array_address = EHRelative.resolve_offset(
-                self.view,
-                self.source['pHandlerArray'].value,
-            )
             return [
-                HandlerType.create(self.view, handler_array_address + (i * handler_type_width))
+                HandlerType.create(self.view, self.handler_array_address + (i * handler_type_width))
                 for i in range(self['nCatches'])
             ]
 
@@ -49,10 +53,7 @@ class TryBlockMapEntry(CheckedTypeDataVar, members=[
             return
 
         self.view.define_user_data_var(
-            EHRelative.resolve_offset(
-                self.view,
-                self.source['pHandlerArray'].value,
-            ),
+            self.handler_array_address,
             bn.Type.array(
                 HandlerType.get_typedef_ref(self.view),
                 len(self.handlers),
@@ -78,17 +79,19 @@ class ESTypeList(CheckedTypeDataVar, members=[
     name = "ESTypeList"
     alt_name = "_s_ESTypeList"
 
-    types: Annotated[list[HandlerType], 'pTypeArray']
+    @cached_property
+    def type_array_address(self) -> int:
+        return EHRelative.resolve_offset(self.view, self.source['pTypeArray'].value)
+
+    @cached_property
+    def types(self) -> list[HandlerType]:
+        return self['pTypeArray']
 
     def __getitem__(self, key: str):
         if key == 'pTypeArray':
             handler_type_width = HandlerType.get_structure(self.view).width
-            type_array_address = EHRelative.resolve_offset(
-                self.view,
-                self.source['pTypeArray'].value,
-            )
-            self.types = [
-                HandlerType.create(self.view, type_array_address + (i * handler_type_width))
+            return [
+                HandlerType.create(self.view, self.type_array_address + (i * handler_type_width))
                 for i in range(self['nCount'])
             ]
 
@@ -99,10 +102,7 @@ class ESTypeList(CheckedTypeDataVar, members=[
             return
 
         self.view.define_user_data_var(
-            EHRelative.resolve_offset(
-                self.view,
-                self.source['pTypeArray'].value,
-            ),
+            self.type_array_address,
             bn.Type.array(
                 HandlerType.get_typedef_ref(self.view),
                 len(self.types),
@@ -134,76 +134,96 @@ class _FuncInfoBase:
 
     bbt_flag: int
     max_state: Annotated[int, 'maxState']
-    unwind_map: list[UnwindMapEntry]
-    try_blocks: list[TryBlockMapEntry]
-    ip_map_entries: list[IpToStateMapEntry]
+    ip_map_length: int
+    map_addresses: dict[str, int]
     es_type_list: ESTypeList
 
     def __init__(self, view: bn.BinaryView, source: bn.TypedDataAccessor | int):
         super().__init__(view, source)
+        self.map_addresses = {}
         self.bbt_flag = self['magicNumberAndBBTFlag'] & 7
 
-        first_unwind_map = UnwindMapEntry.create(
-            self.view,
-            self.source['pUnwindMap'].value,
-        )
-        if first_unwind_map.to_state > self.max_state:
-            raise ValueError('Invalid unwind map')
-
-        unwind_entry_width = UnwindMapEntry.get_structure(self.view).width
-        unwind_map_address = EHRelative.resolve_offset(
-            self.view,
-            self.source['pUnwindMap'].value,
-        )
-        self.unwind_map = [
-            UnwindMapEntry.create(
+        # Maps are validated here from raw reads; their entry objects are
+        # only built when they are needed, i.e. when marking down
+        if self.max_state > 0:
+            unwind_map_address = self.check_map(UnwindMapEntry, 'pUnwindMap', self.max_state)
+            to_state = UnwindMapEntry.get_structure(self.view)['toState']
+            if self.view.read_int(
+                unwind_map_address + to_state.offset,
+                to_state.type.width,
+                True,
+            ) > self.max_state:
+                raise ValueError('Invalid unwind map')
+
+        self.check_map(TryBlockMapEntry, 'pTryBlockMap', self['nTryBlocks'])
+
+        self.ip_map_length = self['nIPMapEntries']
+        self.check_map(IpToStateMapEntry, 'pIPtoStateMap', self.ip_map_length)
+
+    @cached_property
+    def unwind_map(self) -> list[UnwindMapEntry]:
+        return self.create_map(UnwindMapEntry, 'pUnwindMap', self.max_state)
+
+    @cached_property
+    def try_blocks(self) -> list[TryBlockMapEntry]:
+        return self.create_map(TryBlockMapEntry, 'pTryBlockMap', self['nTryBlocks'])
+
+    @cached_property
+    def ip_map_entries(self) -> list[IpToStateMapEntry]:
+        return self.create_map(IpToStateMapEntry, 'pIPtoStateMap', self.ip_map_length)
+
+    def get_map_address(self, name: str) -> int:
+        # Each map pointer is resolved once, when it is checked, and reused
+        # when its entries are created and marked down
+        if (map_address := self.map_addresses.get(name)) is None:
+            map_address = EHRelative.resolve_offset(self.view, self.source[name].value)
+            self.map_addresses[name] = map_address
+
+        return map_address
+
+    def check_map(
+        self,
+        entry_type: type[CheckedTypeDataVar],
+        name: str,
+        length: int,
+    ) -> Optional[int]:
+        if length <= 0:
+            return None
+
+        map_address = self.get_map_address(name)
+        # Rejects maps that run past mapped data here, instead of entry by
+        # entry when they are marked down; a segment is contiguous, so this
+        # costs the same however long the map claims to be
+        map_size = entry_type.get_structure(self.view).width * length
+        segment = self.view.get_segment_at(map_address)
+        if segment is None or map_address + map_size > segment.end:
+            raise ValueError(f'Invalid {name}')
+
+        return map_address
+
+    def create_map(
+        self,
+        entry_type: type[CheckedTypeDataVar],
+        name: str,
+        length: int,
+    ) -> list[CheckedTypeDataVar]:
+        if length <= 0:
+            return []
+
+        entry_width = entry_type.get_structure(self.view).width
+        map_address = self.get_map_address(name)
+        return [
+            entry_type.create(
                 self.view,
-                unwind_map_address + (i * unwind_entry_width),
+                map_address + (i * entry_width),
             )
-            for i in range(self.max_state)
+            for i in range(length)
         ]
 
-        try_block_map_length = self['nTryBlocks']
-        if try_block_map_length == 0:
-            self.try_blocks = []
-        else:
-            try_block_entry_width = TryBlockMapEntry.get_structure(self.view).width
-            try_block_map_address = EHRelative.resolve_offset(
-                self.view,
-                self.source['pTryBlockMap'].value,
-            )
-            self.try_blocks = [
-                TryBlockMapEntry.create(
-                    self.view,
-                    try_block_map_address + (i * try_block_entry_width),
-                )
-                for i in range(try_block_map_length)
-            ]
-
-        ip_map_length = self['nIPMapEntries']
-        if ip_map_length == 0:
-            self.ip_map_entries = []
-        else:
-            ip_entry_width = IpToStateMapEntry.get_structure(self.view).width
-            ip_map_address = EHRelative.resolve_offset(
-                view,
-                self.source['pIPtoStateMap'].value,
-            )
-            self.ip_map_entries = [
-                IpToStateMapEntry.create(
-                    self.view,
-                    ip_map_address + (i * ip_entry_width),
-                )
-                for i in range(ip_map_length)
-            ]
-
     def mark_down_members(self):
         if self.max_state > 0:
             self.view.define_user_data_var(
-                EHRelative.resolve_offset(
-                    self.view,
-                    self.source['pUnwindMap'].value,
-                ),
+                self.get_map_address('pUnwindMap'),
                 bn.Type.array(
                     UnwindMapEntry.get_typedef_ref(self.view),
                     self.max_state,
@@ -214,10 +234,7 @@ class _FuncInfoBase:
 
         if len(self.try_blocks) > 0:
             self.view.define_user_data_var(
-                EHRelative.resolve_offset(
-                    self.view,
-                    self.source['pTryBlockMap'].value,
-                ),
+                self.get_map_address('pTryBlockMap'),
                 bn.Type.array(
                     TryBlockMapEntry.get_typedef_ref(self.view),
                     len(self.try_blocks),
@@ -226,19 +243,14 @@ class _FuncInfoBase:
             for entry in self.try_blocks:
                 entry.mark_down_members()
 
-        if len(self.ip_map_entries) > 0:
+        if self.ip_map_length > 0:
             self.view.define_user_data_var(
-                EHRelative.resolve_offset(
-                    self.view,
-                    self.source['pIPtoStateMap'].value,
-                ),
+                self.get_map_address('pIPtoStateMap'),
                 bn.Type.array(
                     IpToStateMapEntry.get_typedef_ref(self.view),
-                    len(self.ip_map_entries),
+                    self.ip_map_length,
                 ),
             )
-            for entry in self.ip_map_entries:
-                entry.mark_down_members()
 
 class _FuncInfo(_FuncInfoBase, CheckedTypeDataVar,
     members=[
@@ -274,42 +286,62 @@ class FuncInfo(CheckedTypedef):
         task: Optional[bn.BackgroundTask] = None
     ) -> Generator[Self, None, None]:
         structure = cls.get_structure(view)
+        max_state_offset = structure['maxState'].offset
+        max_state_width = structure['maxState'].type.width
+        unwind_map_offset = structure['pUnwindMap'].offset
+        unwind_map_width = structure['pUnwindMap'].type.width
+        eh_base = EHRelative.resolve_offset(view, 0)
+        align_mask = cls.get_alignment(view) - 1
+        max_state_struct = get_offset_struct(max_state_width, view.endianness, signed=True)
+        unwind_map_struct = get_offset_struct(unwind_map_width, view.endianness)
+        # The scan hands over the header up to the last field checked below
+        header_size = max(
+            max_state_offset + max_state_width,
+            unwind_map_offset + unwind_map_width,
+        )
 
-        matches = []
+        # Keyed by address, as sections (and so their scans) may overlap
+        matches = {}
         def update_progress(processed: int, total: int) -> bool:
             task.progress = f'{cls.name} search {processed:x}/{total:x}'
             return not task.cancelled
 
-        def is_potential_func_info(accessor: bn.TypedDataAccessor) -> bool:
-            if accessor.address % cls.get_alignment(view) != 0:
+        def is_potential_func_info(header: bytes) -> bool:
+            (max_state,) = max_state_struct.unpack_from(header, max_state_offset)
+            if max_state == 0:
                 return False
 
-            if accessor['maxState'].value == 0:
+            if max_state >= 0xffff:
                 return False
 
-            if accessor['maxState'].value >= 0xffff:
+            # A non-empty unwind map must point into the view; rejecting
+            # here saves building (and failing) the whole func info
+            unwind_map = eh_base + unwind_map_struct.unpack_from(header, unwind_map_offset)[0]
+            if max_state > 0 and not view.is_valid_offset(unwind_map):
                 return False
 
             return True
 
-        def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
-            accessor = view.typed_data_accessor(address, structure)
-            if is_potential_func_info(accessor):
-                matches.append(accessor)
+        def process_match(address: int, header: bytes) -> bool:
+            if address & align_mask or address in matches:
+                return True
+
+            if is_potential_func_info(header):
+                matches[address] = view.typed_data_accessor(address, structure)
 
             return True
 
-        for pattern in FUNC_INFO_MAGIC_NUMBERS:
-            for section in get_data_sections(view):
-                view.find_all_data(
-                    section.start, section.end,
-                    pattern,
-                    progress_func=update_progress if task is not None else None,
-                    match_callback=process_match,
-                )
+        find_any_data_in_sections(
+            view, get_data_sections(view),
+            FUNC_INFO_MAGIC_NUMBERS,
+            match_callback=process_match,
+            progress_func=update_progress if task is not None else None,
+            trailing=header_size - len(FUNC_INFO_MAGIC_NUMBERS[0]),
+        )
 
         underlying_type = cls.get_actual_type(view)
-        for accessor in matches:
+        for address in sorted(matches):
+            accessor = matches[address]
             try:
                 col = underlying_type.create(view, accessor)
                 yield col
@@ -125,6 +125,26 @@ class UnwindMapEntry4(CheckedTypeDataVar, members=[
         return builder.immutable_copy()
 
 class UnwindMapRenderer(bn.DataRenderer):
+    # Identical for every entry, so built once rather than per render
+    type_line_tokens = [
+        bn.InstructionTextToken(
+            bn.InstructionTextTokenType.TypeNameToken,
+            "uint8_t",
+        ),
+        bn.InstructionTextToken(
+            bn.InstructionTextTokenType.TextToken,
+            " ",
+        ),
+        bn.InstructionTextToken(
+            bn.InstructionTextTokenType.TextToken,
+            "Type",
+        ),
+        bn.InstructionTextToken(
+            bn.InstructionTextTokenType.TextToken,
+            " = ",
+        ),
+    ]
+
     def perform_is_valid_for_data(self, ctxt, view, _, _type, context):
         if len(context) == 0:
             return False
@@ -176,22 +196,7 @@ class UnwindMapRenderer(bn.DataRenderer):
                 offset_token,
             ], address),
             bn.DisassemblyTextLine([
-                bn.InstructionTextToken(
-                    bn.InstructionTextTokenType.TypeNameToken,
-                    "uint8_t",
-                ),
-                bn.InstructionTextToken(
-                    bn.InstructionTextTokenType.TextToken,
-                    " ",
-                ),
-                bn.InstructionTextToken(
-                    bn.InstructionTextTokenType.TextToken,
-                    "Type",
-                ),
-                bn.InstructionTextToken(
-                    bn.InstructionTextTokenType.TextToken,
-                    " = ",
-                ),
+                *self.type_line_tokens,
                 enum_token,
             ], address),
         ]
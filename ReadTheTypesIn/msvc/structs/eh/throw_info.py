@@ -1,8 +1,10 @@
 from typing import Optional, Generator, Self, Annotated
+from functools import cached_property
 import traceback
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, RTTIRelative
-from ....utils import get_data_sections, get_function
+from ....utils import \
+    get_data_sections, find_any_data_in_sections, filter_function_targets, get_high_byte_patterns
 from .catchable_type import CatchableTypeArray
 
 PATTERN_SHIFT_SIZE = 2
@@ -39,11 +41,11 @@ class ThrowInfo(CheckedTypeDataVar,
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def type_name(self):
         return self.catchable_type_array[0].type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -56,64 +58,61 @@ class ThrowInfo(CheckedTypeDataVar,
         catchable_type_arrays: list[CatchableTypeArray],
         task: Optional[bn.BackgroundTask] = None
     ) -> Generator[Self, None, None]:
-        cta_offsets = set(
-            RTTIRelative.encode_offset(
-                view,
-                cta.address
-            )
-            for cta in catchable_type_arrays
+        cta_offsets = RTTIRelative.encode_offset_bulk(
+            view,
+            (cta.address for cta in catchable_type_arrays),
         )
+        if len(cta_offsets) == 0:
+            return
+
+        rtti_base = RTTIRelative.resolve_offset(view, 0)
 
         structure = cls.get_structure(view)
         array_offset = structure['pCatchableTypeArray'].offset
+        array_width = structure['pCatchableTypeArray'].type.width
+        unwind_offset = structure['pmfnUnwind'].offset
+        unwind_width = structure['pmfnUnwind'].type.width
+        align_mask = cls.get_alignment(view) - 1
+        read_int = view.read_int
 
-        matches = []
+        candidates = []
         def update_progress(processed: int, total: int) -> bool:
             task.progress = f'{cls.name} search {processed:x}/{total:x}'
             return not task.cancelled
 
-        def is_potential_throw_info(accessor: bn.TypedDataAccessor) -> bool:
-            if accessor.address % cls.get_alignment(view) != 0:
-                return False
+        def process_match(address: int, _: bytes) -> bool:
+            address -= PATTERN_SHIFT_SIZE
+            if (address - array_offset) & align_mask:
+                return True
 
-            offset = accessor['pCatchableTypeArray'].value
-            if offset not in cta_offsets:
-                return False
-
-            if get_function(
-                view,
-                RTTIRelative.resolve_offset(
-                    view,
-                    accessor['pmfnUnwind'].value,
-                )
-            ) is None:
-                return False
+            # The pattern only covers the high bytes of the offset
+            if read_int(address, array_width, False) in cta_offsets:
+                candidates.append(address - array_offset)
 
             return True
 
-        def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
-            address -= PATTERN_SHIFT_SIZE
-            accessor = view.typed_data_accessor(address - array_offset, structure)
-            if is_potential_throw_info(accessor):
-                matches.append(accessor)
-
-            return True
+        patterns = get_high_byte_patterns(
+            view, cta_offsets,
+            view.address_size, PATTERN_SHIFT_SIZE,
+        )
 
-        patterns = set(
-            (address >> (8 * PATTERN_SHIFT_SIZE)).to_bytes(
-                view.address_size - PATTERN_SHIFT_SIZE,
-                'little' if view.endianness is bn.Endianness.LittleEndian else 'big')
-            for address in cta_offsets
+        find_any_data_in_sections(
+            view, get_data_sections(view),
+            patterns,
+            match_callback=process_match,
+            progress_func=update_progress if task is not None else None,
         )
 
-        for pattern in patterns:
-            for section in get_data_sections(view):
-                view.find_all_data(
-                    section.start, section.end,
-                    pattern,
-                    progress_func=update_progress if task is not None else None,
-                    match_callback=process_match,
-                )
+        # Throw infos for the same type share their unwind function
+        matches = [
+            view.typed_data_accessor(address, structure)
+            for address in filter_function_targets(
+                view, candidates,
+                lambda address: rtti_base + read_int(
+                    address + unwind_offset, unwind_width, False
+                ),
+            )
+        ]
 
         for accessor in matches:
             try:
@@ -1,7 +1,10 @@
 from typing import Optional, Annotated
+from functools import cached_property
 from enum import IntFlag
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, Array, Enum, RTTIRelative, NamedCheckedTypeRef
+from ....types.resolver import resolve_type_spec
+from ....utils import unpack_offsets
 from .type_descriptor import TypeDescriptor
 
 class PMD(CheckedTypeDataVar, members=[
@@ -13,6 +16,20 @@ class PMD(CheckedTypeDataVar, members=[
     pdisp: Annotated[int, 'pdisp']
     vdisp: Annotated[int, 'vdisp']
 
+    @property
+    def displacements(self) -> tuple[int, int, int]:
+        # All three fields in one read, for callers that need every one of them
+        structure = self.get_structure(self.view)
+        data = self.view.read(self.address, structure.width)
+        if len(data) != structure.width:
+            raise ValueError("Invalid PMD (truncated)")
+
+        return tuple(unpack_offsets(
+            self.view, data,
+            structure['mdisp'].type.width,
+            signed=True,
+        ))
+
 class BCDAttributes(IntFlag):
     BCD_NOTVISIBLE          = 0x00000001
     BCD_AMBIGUOUS           = 0x00000002
@@ -52,16 +69,16 @@ class BaseClassDescriptor(CheckedTypeDataVar,
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def type_name(self):
         return self.type_descriptor.type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
 
-        where = f'{self.where.mdisp},{self.where.pdisp},{self.where.vdisp}'
+        where = ','.join(str(disp) for disp in self.where.displacements)
         location = f'({where},{int(self.attributes)})'
         return f"{self.type_name.name}::`RTTI Base Class Descriptor at {location}'"
 
@@ -84,6 +101,28 @@ class BaseClassArray(CheckedTypeDataVar,
         self.length = length
         super().__init__(view, source)
 
+        # Arrays are shared between hierarchies and iterated repeatedly while
+        # structuring, so resolve the descriptors once rather than per access
+        self.base_class_descs = self._read_base_class_descs()
+
+    def _read_base_class_descs(self) -> list[BaseClassDescriptor]:
+        element_width = resolve_type_spec(
+            self.view,
+            RTTIRelative[BaseClassDescriptor],
+        ).width
+        start = self.address + self.get_structure(self.view).width
+        data = self.view.read(start, element_width * self.length)
+        if len(data) != element_width * self.length:
+            raise ValueError("Invalid BaseClassArray (truncated)")
+
+        return [
+            BaseClassDescriptor.create(
+                self.view,
+                RTTIRelative.resolve_offset(self.view, offset),
+            )
+            for offset in unpack_offsets(self.view, data, element_width)
+        ]
+
     def get_array_length(self, name: str):
         if name == 'arrayOfBaseClassDescriptors':
             return self.length
@@ -105,11 +144,11 @@ class BaseClassArray(CheckedTypeDataVar,
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def type_name(self):
         return self[0].type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -1,4 +1,5 @@
 from typing import Annotated
+from functools import cached_property
 from enum import IntFlag
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, Enum, RTTIRelative
@@ -41,11 +42,11 @@ class ClassHierarchyDescriptor(CheckedTypeDataVar,
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def type_name(self):
         return self.base_class_array[0].type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
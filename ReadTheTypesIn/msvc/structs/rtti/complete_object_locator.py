@@ -1,11 +1,13 @@
-from typing import Optional, Generator, Self, Annotated
+from typing import Optional, Generator, Iterable, Self, Annotated
+from functools import cached_property
 from enum import IntEnum
 import traceback
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, CheckedTypedef, Enum, RTTIRelative, NamedCheckedTypeRef
-from ....utils import get_data_sections
+from ....utils import get_data_sections, find_all_data_in_sections
 from .type_descriptor import TypeDescriptor
 from .class_hierarchy_descriptor import ClassHierarchyDescriptor
+from .base_class_descriptor import BaseClassDescriptor
 
 class COLSignature(IntEnum):
     COL_SIG_REV0 = 0x00000000
@@ -20,6 +22,9 @@ COMPLETE_OBJECT_LOCATOR_MEMBERS = [
 ]
 
 class _CompleteObjectLocatorBase:
+    view: bn.BinaryView
+    source: bn.TypedDataAccessor
+
     offset: Annotated[int, 'offset']
     complete_displacement_offset: Annotated[int, 'cdOffset']
     type_descriptor: Annotated[TypeDescriptor, 'pTypeDescriptor']
@@ -28,18 +33,61 @@ class _CompleteObjectLocatorBase:
     def __init__(self, view: bn.BinaryView, source: bn.TypedDataAccessor | int):
         super().__init__(view, source)
 
-        bca = self.class_hierarchy_descriptor.base_class_array
-        if self.type_descriptor is not bca[0].type_descriptor:
+        # Follow CHD -> BCA[0] -> pTypeDescriptor with raw reads first, so
+        # most rejected candidates never materialise a hierarchy descriptor
+        read_int = view.read_int
+        chd_structure = ClassHierarchyDescriptor.get_structure(view)
+        signature_field = chd_structure['signature']
+        count_field = chd_structure['numBaseClasses']
+        bca_field = chd_structure['pBaseClassArray']
+        td_field = BaseClassDescriptor.get_structure(view)['pTypeDescriptor']
+
+        chd_address = RTTIRelative.resolve_offset(view, self.source['pClassDescriptor'].value)
+        if read_int(chd_address + signature_field.offset, signature_field.type.width, False) != 0:
+            raise ValueError('Invalid class hierarchy descriptor signature')
+
+        num_base_classes = read_int(chd_address + count_field.offset, count_field.type.width, False)
+        if num_base_classes == 0:
+            raise ValueError('Class hierarchy descriptor has no base classes')
+
+        bca_address = RTTIRelative.resolve_offset(
+            view,
+            read_int(chd_address + bca_field.offset, bca_field.type.width, False),
+        )
+        segment = view.get_segment_at(bca_address)
+        if segment is None or \
+            bca_address + num_base_classes * bca_field.type.width > segment.end:
+            raise ValueError('Invalid base class array')
+
+        bcd_address = RTTIRelative.resolve_offset(
+            view,
+            read_int(bca_address, bca_field.type.width, False),
+        )
+        td_offset = read_int(bcd_address + td_field.offset, td_field.type.width, False)
+        if td_offset != self.source['pTypeDescriptor'].value:
             raise ValueError('Type descriptors do not match')
 
-    @property
+        # Only candidates that got this far build the descriptor, which reads
+        # every base class descriptor before the locator is accepted
+        _ = self.class_hierarchy_descriptor.base_class_array
+
+    # Resolved once on first use; later passes read them repeatedly
+    @cached_property
+    def type_descriptor(self) -> TypeDescriptor:
+        return self['pTypeDescriptor']
+
+    @cached_property
+    def class_hierarchy_descriptor(self) -> ClassHierarchyDescriptor:
+        return self['pClassDescriptor']
+
+    @cached_property
     def type_name(self):
         if self.offset > 0:
             return None
 
         return self.type_descriptor.type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -52,6 +100,10 @@ class _CompleteObjectLocator(_CompleteObjectLocatorBase, CheckedTypeDataVar,
     name = '_s_RTTICompleteObjectLocator'
     alt_name = '_s__RTTICompleteObjectLocator'
 
+    @classmethod
+    def _from_search(cls, view: bn.BinaryView, accessor: bn.TypedDataAccessor) -> Self:
+        return cls.create(view, accessor)
+
 class _CompleteObjectLocator2(_CompleteObjectLocatorBase, CheckedTypeDataVar,
     members=[
         *COMPLETE_OBJECT_LOCATOR_MEMBERS,
@@ -61,8 +113,16 @@ class _CompleteObjectLocator2(_CompleteObjectLocatorBase, CheckedTypeDataVar,
     name = '_s_RTTICompleteObjectLocator2'
     alt_name = '_s__RTTICompleteObjectLocator2'
 
-    def __init__(self, view: bn.BinaryView, source: bn.TypedDataAccessor | int):
+    def __init__(
+        self,
+        view: bn.BinaryView,
+        source: bn.TypedDataAccessor | int,
+        _pself_checked: bool = False,
+    ):
         super().__init__(view, source)
+        if _pself_checked:
+            return
+
         if self.source['pSelf'].value != RTTIRelative.encode_offset(view, self.address):
             raise ValueError('Invalid pSelf')
 
@@ -74,6 +134,11 @@ class _CompleteObjectLocator2(_CompleteObjectLocatorBase, CheckedTypeDataVar,
             if RTTIRelative.get_target(mtype) is not None:
                 self[name].mark_down()
 
+    @classmethod
+    def _from_search(cls, view: bn.BinaryView, accessor: bn.TypedDataAccessor) -> Self:
+        # The search already matched pSelf against the candidate's address
+        return cls.create(view, accessor, _pself_checked=True)
+
 class CompleteObjectLocator(CheckedTypedef):
     name = '_RTTICompleteObjectLocator'
 
@@ -94,17 +159,29 @@ class CompleteObjectLocator(CheckedTypedef):
     @classmethod
     def search_with_type_descriptors(
         cls, view: bn.BinaryView,
-        type_descriptors: list[TypeDescriptor],
+        type_descriptors: Iterable[TypeDescriptor],
         task: Optional[bn.BackgroundTask] = None
     ) -> Generator[Self, None, None]:
-        type_desc_offsets = set(
-            RTTIRelative.encode_offset(view, desc.address)
-            for desc in type_descriptors
-            if not desc.decorated_name.startswith(".?AV<lambda")
+        type_desc_offsets = RTTIRelative.encode_offset_bulk(
+            view,
+            (
+                desc.address
+                for desc in type_descriptors
+                if not desc.decorated_name.startswith(".?AV<lambda")
+            ),
         )
+        if len(type_desc_offsets) == 0:
+            return
+
+        rtti_base = RTTIRelative.resolve_offset(view, 0)
 
         data_sections = list(get_data_sections(view))
         structure = cls.get_structure(view)
+        align_mask = cls.get_alignment(view) - 1
+        td_field_offset = structure['pTypeDescriptor'].offset
+        td_field_width = structure['pTypeDescriptor'].type.width
+        has_pself = any(member.name == 'pSelf' for member in structure.members)
+        read_int = view.read_int
 
         invalid_pchds = set()
         matches = []
@@ -113,9 +190,6 @@ class CompleteObjectLocator(CheckedTypedef):
             return not task.cancelled
 
         def is_potential_complete_object_locator(accessor: bn.TypedDataAccessor) -> bool:
-            if accessor.address % cls.get_alignment(view) != 0:
-                return False
-
             td_offset = accessor['pTypeDescriptor'].value
             if td_offset not in type_desc_offsets:
                 return False
@@ -123,20 +197,27 @@ class CompleteObjectLocator(CheckedTypedef):
             chd_offset = accessor['pClassDescriptor'].value
             if chd_offset in invalid_pchds or not any(
                 section in data_sections
-                for section in view.get_sections_at(
-                    RTTIRelative.resolve_offset(view, chd_offset)
-                )
+                for section in view.get_sections_at(rtti_base + chd_offset)
             ):
                 invalid_pchds.add(chd_offset)
                 return False
 
-            if any(member.name == 'pSelf' for member in structure.members):
-                if accessor['pSelf'].value != RTTIRelative.encode_offset(view, accessor.address):
+            if has_pself:
+                if accessor['pSelf'].value != accessor.address - rtti_base:
                     return False
 
             return True
 
         def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
+            if address & align_mask:
+                return True
+
+            # The signature is a tiny integer and matches almost everywhere, so
+            # reject on the raw type descriptor offset before building an accessor
+            if read_int(address + td_field_offset, td_field_width, False) \
+                not in type_desc_offsets:
+                return True
+
             accessor = view.typed_data_accessor(address, structure)
             if is_potential_complete_object_locator(accessor):
                 matches.append(accessor)
@@ -148,18 +229,19 @@ class CompleteObjectLocator(CheckedTypedef):
             'little' if view.endianness is bn.Endianness.LittleEndian else 'big'
         )
 
-        for section in data_sections:
-            view.find_all_data(
-                section.start, section.end,
-                signature,
-                progress_func=update_progress if task is not None else None,
-                match_callback=process_match,
-            )
+        find_all_data_in_sections(
+            view, data_sections,
+            signature,
+            progress_func=update_progress if task is not None else None,
+            match_callback=process_match,
+        )
+        matches.sort(key=lambda accessor: accessor.address)
 
         underlying_type = cls.get_actual_type(view)
         for accessor in matches:
             try:
-                col = underlying_type.create(view, accessor)
+                # pylint: disable-next=protected-access
+                col = underlying_type._from_search(view, accessor)
                 yield col
             except Exception:
                 bn.log.log_warn(
@@ -1,10 +1,11 @@
-from typing import Optional, Generator, Self, Annotated
+from typing import Optional, Generator, Self
+from functools import cached_property
 import traceback
 from collections import Counter
 import binaryninja as bn
 from ....types import CheckedTypeDataVar, Array
 from ....name import parse_from_msvc_type_descriptor_name
-from ....utils import get_data_sections
+from ....utils import get_data_sections, find_all_data_in_sections
 
 TYPE_DESCRIPTOR_NAME_PREFIX = '.?A'
 CLASS_TYPE_ID_PREFIX = TYPE_DESCRIPTOR_NAME_PREFIX + 'V'
@@ -20,21 +21,23 @@ class TypeDescriptor(CheckedTypeDataVar, members=[
 ]):
     packed = True
 
-    decorated_name: Annotated[str, 'name']
-
     def __init__(self, view: bn.BinaryView, source: bn.TypedDataAccessor | int):
         super().__init__(view, source)
 
         if self['spare'].value != 0:
             raise ValueError("Invalid TypeDescriptor (non-null spare)")
 
+    @cached_property
+    def decorated_name(self) -> str:
+        return self['name']
+
     def get_array_length(self, name: str):
         if name == 'name':
             return len(self.decorated_name) + 1
 
         return super().get_array_length(name)
 
-    @property
+    @cached_property
     def type_name(self):
         try:
             return parse_from_msvc_type_descriptor_name(
@@ -64,7 +67,7 @@ class TypeDescriptor(CheckedTypeDataVar, members=[
 
         return super().__getitem__(key)
 
-    @property
+    @cached_property
     def symbol_name(self):
         if self.type_name is None:
             return None
@@ -79,6 +82,7 @@ class TypeDescriptor(CheckedTypeDataVar, members=[
     ) -> Generator[Self, None, None]:
         structure = cls.get_structure(view)
         name_offset = structure['name'].offset
+        align_mask = cls.get_alignment(view) - 1
 
         matches = []
         def update_progress(processed: int, total: int) -> bool:
@@ -86,9 +90,6 @@ class TypeDescriptor(CheckedTypeDataVar, members=[
             return not task.cancelled
 
         def is_potential_type_descriptor(accessor: bn.TypedDataAccessor):
-            if accessor.address % cls.get_alignment(view) != 0:
-                return False
-
             if (name := view.get_ascii_string_at(
                 accessor.address + name_offset,
                 max_length=MAX_NAME_LEN,
@@ -103,18 +104,21 @@ class TypeDescriptor(CheckedTypeDataVar, members=[
             return True
 
         def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
+            if (address - name_offset) & align_mask:
+                return True
+
             accessor = view.typed_data_accessor(address - name_offset, structure)
             if is_potential_type_descriptor(accessor):
                 matches.append(accessor)
             return True
 
-        for section in get_data_sections(view):
-            view.find_all_data(
-                section.start, section.end,
-                TYPE_DESCRIPTOR_NAME_PREFIX.encode(),
-                progress_func=update_progress if task is not None else None,
-                match_callback=process_match,
-            )
+        find_all_data_in_sections(
+            view, get_data_sections(view),
+            TYPE_DESCRIPTOR_NAME_PREFIX.encode(),
+            progress_func=update_progress if task is not None else None,
+            match_callback=process_match,
+        )
+        matches.sort(key=lambda accessor: accessor.address)
 
         vftable_counter = Counter([
             accessor['pVFTable'].value
@@ -1,8 +1,11 @@
 from typing import Optional, Generator, Self
+from functools import cached_property
 from weakref import WeakKeyDictionary
 import traceback
 import binaryninja as bn
-from ...utils import get_data_sections, get_function
+from ...utils import \
+    get_data_sections, get_function, find_any_data_in_sections, filter_function_targets, \
+    get_high_byte_patterns
 from .rtti.complete_object_locator import CompleteObjectLocator
 
 PATTERN_SHIFT_SIZE = 3
@@ -89,11 +92,11 @@ class VirtualFunctionTable:
             view_instances.pop(address, None)
             raise ValueError(f"Failed to create {cls.__name__} @ {address:x}") from e
 
-    @property
+    @cached_property
     def type_name(self):
         return self.meta.type_name
 
-    @property
+    @cached_property
     def symbol_name(self):
         return f"{self.type_name.name}::`vftable'"
 
@@ -108,7 +111,10 @@ class VirtualFunctionTable:
             col.address: col
             for col in complete_object_locators
         }
-        matches = []
+        if len(pointers) == 0:
+            return
+
+        candidates = []
 
         def update_progress(processed: int, total: int) -> bool:
             task.progress = f'{cls.__name__} search {processed:x}/{total:x}'
@@ -130,40 +136,30 @@ class VirtualFunctionTable:
             except ValueError:
                 return False
 
-            if get_function(
-                view,
-                view.read_pointer(
-                    address
-                )
-            ) is None:
-                return False
-
             return True
 
-        def process_match(address: int, _: bn.databuffer.DataBuffer) -> bool:
+        def process_match(address: int, _: bytes) -> bool:
             address -= PATTERN_SHIFT_SIZE
             if is_potential_vftable(
                 address
             ):
-                matches.append(address)
+                candidates.append(address)
 
             return True
 
-        patterns = set(
-            (address >> (8 * PATTERN_SHIFT_SIZE)).to_bytes(
-                view.address_size - PATTERN_SHIFT_SIZE,
-                'little' if view.endianness is bn.Endianness.LittleEndian else 'big')
-            for address in pointers
+        patterns = get_high_byte_patterns(
+            view, pointers,
+            view.address_size, PATTERN_SHIFT_SIZE,
         )
 
-        for pattern in patterns:
-            for section in get_data_sections(view):
-                view.find_all_data(
-                    section.start, section.end,
-                    pattern,
-                    progress_func=update_progress if task is not None else None,
-                    match_callback=process_match,
-                )
+        find_any_data_in_sections(
+            view, get_data_sections(view),
+            patterns,
+            progress_func=update_progress if task is not None else None,
+            match_callback=process_match,
+        )
+
+        matches = filter_function_targets(view, candidates, view.read_pointer)
 
         for address in matches:
             try:
@@ -1,4 +1,4 @@
-from functools import cache
+from functools import lru_cache
 import re
 import binaryninja as bn
 from binaryninja.enums import StructureVariant
@@ -36,35 +36,33 @@ STD_TYPEDEFS = {
     "basic_ostringstream<wchar_t,struct std::char_traits<wchar_t>,class std::allocator<wchar_t> >": "wostringstream",
     "basic_stringstream<wchar_t,struct std::char_traits<wchar_t>,class std::allocator<wchar_t> >": "wstringstream",
 }
+
+STD_TYPEDEF_PATTERN = re.compile(
+    r'class std::(' + '|'.join(
+        re.escape(std_type)
+        for std_type in sorted(STD_TYPEDEFS, key=len, reverse=True)
+    ) + r')'
+)
+STD_MAP_PATTERN = re.compile(r'class std::map<(.+?),(.+?),struct std::less<\1 ?>,class std::allocator<struct std::pair<\1 const,\2 ?> >')
+STD_VECTOR_PATTERN = re.compile(r'class std::vector<(.+?),class std::allocator<\1 ?> >')
+TEMPLATE_CLOSE_PATTERN = re.compile(r'(\w) >')
+STD_NIL_PATTERN = re.compile(r',struct std::_Nil>')
+
+STD_MAP_NAME_PATTERN = re.compile(r'map<(.+?),(.+?),struct std::less<\1 ?>,class std::allocator<struct std::pair<\1 const,\2> >')
+STD_VECTOR_NAME_PATTERN = re.compile(r'vector<(.+?),class std::allocator<\1 ?> >')
 # pylint: enable=line-too-long
 
+def _replace_std_typedef(match: re.Match) -> str:
+    return "class std::" + STD_TYPEDEFS[match.group(1)]
+
 def simplify_name(name: str) -> str:
     old_name = name
     while True:
-        new_name = old_name
-        for std_type, typedef in STD_TYPEDEFS.items():
-            new_name = new_name.replace("class std::" + std_type, "class std::" + typedef)
-
-        new_name = re.sub(
-            r'class std::map<(.+?),(.+?),struct std::less<\1 ?>,class std::allocator<struct std::pair<\1 const,\2 ?> >',
-            r'class std::map<\1, \2 >',
-            new_name,
-        )
-        new_name = re.sub(
-            r'class std::vector<(.+?),class std::allocator<\1 ?> >',
-            r'class std::vector<\1 >',
-            new_name,
-        )
-        new_name = re.sub(
-            r'(\w) >',
-            r'\1>',
-            new_name,
-        )
-        new_name = re.sub(
-            r',struct std::_Nil>',
-            r'>',
-            new_name,
-        )
+        new_name = STD_TYPEDEF_PATTERN.sub(_replace_std_typedef, old_name)
+        new_name = STD_MAP_PATTERN.sub(r'class std::map<\1, \2 >', new_name)
+        new_name = STD_VECTOR_PATTERN.sub(r'class std::vector<\1 >', new_name)
+        new_name = TEMPLATE_CLOSE_PATTERN.sub(r'\1>', new_name)
+        new_name = STD_NIL_PATTERN.sub(r'>', new_name)
         if old_name == new_name:
             break
 
@@ -77,20 +75,12 @@ def simplify_std_name(name: str) -> str:
         return STD_TYPEDEFS[name]
 
     new_name = name
-    new_name = re.sub(
-        r'map<(.+?),(.+?),struct std::less<\1 ?>,class std::allocator<struct std::pair<\1 const,\2> >',
-        r'map<\1, \2>',
-        new_name,
-    )
-    new_name = re.sub(
-        r'vector<(.+?),class std::allocator<\1 ?> >',
-        r'vector<\1>',
-        new_name,
-    )
+    new_name = STD_MAP_NAME_PATTERN.sub(r'map<\1, \2>', new_name)
+    new_name = STD_VECTOR_NAME_PATTERN.sub(r'vector<\1>', new_name)
 
     return new_name
 
-@cache
+@lru_cache(maxsize=65536)
 def parse_from_msvc_type_descriptor_name(platform: str, decorated_name: str) -> bn.NamedTypeReferenceType:
     demangled_type, _ = bn.demangle_ms(platform, decorated_name)
     if not isinstance(demangled_type, bn.NamedTypeReferenceType):
@@ -1,6 +1,7 @@
-from typing import Optional, Any, Union, get_origin, get_args
+from typing import Optional, Any, Union, Iterable, get_origin, get_args
 from types import GenericAlias
 import binaryninja as bn
+from ..utils import PerViewCache
 
 class Array():
     @classmethod
@@ -106,6 +107,16 @@ class DisplacementOffset():
 
         return address
 
+    @classmethod
+    def encode_offset_bulk(cls, view: bn.BinaryView, addresses: Iterable[int]) -> frozenset[int]:
+        if not cls.is_relative(view):
+            return frozenset(addresses)
+
+        base = view.start
+        return frozenset(address - base for address in addresses)
+
+    # resolve_offset(view, 0) is the base every offset is relative to; searches
+    # take it once and add raw offsets to it rather than resolving each one
     @classmethod
     def resolve_offset(cls, view: bn.BinaryView, offset: int) -> int:
         if cls.is_relative(view):
@@ -113,21 +124,22 @@ class DisplacementOffset():
 
         return offset
 
+# view.arch builds a new Architecture object on every access, and
+# RTTI/EH offsets are resolved for every record a search looks at
+_image_relative_views = PerViewCache()
+
+def is_image_relative(view: bn.BinaryView) -> bool:
+    return _image_relative_views.get(view, 'image_relative', lambda: view.arch.name == 'x86_64')
+
 class RTTIRelative(DisplacementOffset):
     @staticmethod
     def is_relative(view: bn.BinaryView):
-        if view.arch.name == 'x86_64':
-            return True
-
-        return False
+        return is_image_relative(view)
 
 class EHRelative(DisplacementOffset):
     @staticmethod
     def is_relative(view: bn.BinaryView):
-        if view.arch.name == 'x86_64':
-            return True
-
-        return False
+        return is_image_relative(view)
 
 class NamedCheckedTypeRef():
     @classmethod
@@ -2,6 +2,7 @@ from typing import Optional
 import binaryninja as bn
 from .var import CheckedTypeDataVar
 from .annotation import DisplacementOffset, Array
+from ..utils import unpack_offsets
 
 class RelativeOffsetListener(bn.BinaryDataNotification):
     def __init__(self):
@@ -52,98 +53,100 @@ class RelativeOffsetListener(bn.BinaryDataNotification):
 
         return None
 
+    @staticmethod
+    def resolve_array_offsets(
+        view: bn.BinaryView,
+        array: bn.TypedDataAccessor,
+        offset_type: type[DisplacementOffset],
+    ) -> list[tuple[int, int]]:
+        width = array.type.element_type.width
+        data = view.read(array.address, width * array.type.count)
+        base = offset_type.resolve_offset(view, 0)
+        return [
+            (array.address + i * width, base + offset)
+            for i, offset in enumerate(unpack_offsets(view, data, width))
+        ]
+
     def data_var_added(self, view: bn.BinaryView, var: bn.DataVariable) -> None:
         self.received_event = True
         if (var_type := self.find_checked_type(view, var.type)) is None:
             return
 
-        for name, mtype in var_type.member_map.items():
-            if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
-                view.add_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
-                )
-            elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.add_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+        for name, offset_type in var_type.offset_members.items():
+            member = var[name]
+            view.add_user_data_ref(
+                member.address,
+                offset_type.resolve_offset(view, member.value)
+            )
+
+        for name, offset_type in var_type.offset_array_members.items():
+            for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                view.add_user_data_ref(address, target)
 
         for name, mtype in var_type.virtual_relative_members.items():
             if not any(member.name == name for member in var.type.members):
                 continue
 
             if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
+                member = var[name]
                 view.add_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
+                    member.address,
+                    offset_type.resolve_offset(view, member.value)
                 )
             elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.add_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+                for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                    view.add_user_data_ref(address, target)
 
     def data_var_updated(self, view: bn.BinaryView, var: bn.DataVariable) -> None:
         self.received_event = True
         if (var_type := self.find_checked_type(view, var.type)) is None:
             return
 
-        for name, mtype in var_type.member_map.items():
-            if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
-                view.add_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
-                )
-            elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.add_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+        for name, offset_type in var_type.offset_members.items():
+            member = var[name]
+            view.add_user_data_ref(
+                member.address,
+                offset_type.resolve_offset(view, member.value)
+            )
+
+        for name, offset_type in var_type.offset_array_members.items():
+            for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                view.add_user_data_ref(address, target)
 
         for name, mtype in var_type.virtual_relative_members.items():
             if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
+                member = var[name]
                 view.add_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
+                    member.address,
+                    offset_type.resolve_offset(view, member.value)
                 )
             elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.add_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+                for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                    view.add_user_data_ref(address, target)
 
     def data_var_removed(self, view: bn.BinaryView, var: bn.DataVariable) -> None:
         self.received_event = True
         if (var_type := self.find_checked_type(view, var.type)) is None:
             return
 
-        for name, mtype in var_type.member_map.items():
-            if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
-                view.remove_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
-                )
-            elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.remove_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+        for name, offset_type in var_type.offset_members.items():
+            member = var[name]
+            view.remove_user_data_ref(
+                member.address,
+                offset_type.resolve_offset(view, member.value)
+            )
+
+        for name, offset_type in var_type.offset_array_members.items():
+            for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                view.remove_user_data_ref(address, target)
 
         for name, mtype in var_type.virtual_relative_members.items():
             if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
+                member = var[name]
                 view.remove_user_data_ref(
-                    var[name].address,
-                    offset_type.resolve_offset(view, var[name].value)
+                    member.address,
+                    offset_type.resolve_offset(view, member.value)
                 )
             elif (offset_type := DisplacementOffset.get_origin(Array.get_element_type(mtype))) is not None:
-                for element in var[name]:
-                    view.remove_user_data_ref(
-                        element.address,
-                        offset_type.resolve_offset(view, element.value)
-                    )
+                for address, target in self.resolve_array_offsets(view, var[name], offset_type):
+                    view.remove_user_data_ref(address, target)
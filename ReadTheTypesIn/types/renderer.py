@@ -54,6 +54,11 @@ class RelativeOffsetRenderer(bn.DataRenderer):
         ]
 
 class EnumRenderer(bn.DataRenderer):
+    flag_separator_token = bn.InstructionTextToken(
+        bn.InstructionTextTokenType.TextToken,
+        ' | ',
+    )
+
     def find_enum_type(self, view, _type, context):
         if (container_type := next(
             (
@@ -124,12 +129,7 @@ class EnumRenderer(bn.DataRenderer):
         elif isinstance(value, Flag):
             for i, flag in enumerate(value):
                 if i != 0:
-                    tokens.append(
-                        bn.InstructionTextToken(
-                            bn.InstructionTextTokenType.TextToken,
-                            ' | ',
-                        )
-                    )
+                    tokens.append(self.flag_separator_token)
 
                 tokens.append(
                     bn.InstructionTextToken(
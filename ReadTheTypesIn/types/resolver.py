@@ -1,10 +1,13 @@
-from functools import cache
 import binaryninja as bn
+from ..utils import PerViewCache
 from .annotation import DisplacementOffset, Enum, NamedCheckedTypeRef
 
 MemberTypeSpec = str | bn.Type | type['CheckedTypeDataVar'] | type['DisplacementOffset'] | type['Enum']
 
-@cache
+# Only parsed type strings are cached; checked types go through their own
+# get_typedef_ref, which redefines them if they were undone or deleted
+_parsed_type_strings = PerViewCache()
+
 def resolve_type_spec(view: bn.BinaryView, type_spec: MemberTypeSpec) -> bn.Type:
     from .var import CheckedTypeDataVar
     from .typedef import CheckedTypedef
@@ -30,4 +33,7 @@ def resolve_type_spec(view: bn.BinaryView, type_spec: MemberTypeSpec) -> bn.Type
         return resolve_type_spec(view, enum_type)
 
     assert isinstance(type_spec, str), f'Incorrect type spec {type_spec} ({type(type_spec)})'
-    return view.parse_type_string(type_spec)[0]
+    return _parsed_type_strings.get(
+        view, type_spec,
+        lambda: view.parse_type_string(type_spec)[0],
+    )
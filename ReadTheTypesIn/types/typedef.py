@@ -1,6 +1,6 @@
 from abc import abstractmethod
 import binaryninja as bn
-from .var import CheckedTypeDataVar
+from .var import CheckedTypeDataVar, get_registered_type
 
 class CheckedTypedef:
     name: str
@@ -17,7 +17,8 @@ class CheckedTypedef:
     @classmethod
     def define_type(cls, view: bn.BinaryView) -> bn.Type:
         session_data_key = f'ReadTheTypesIn.{cls.name}.defined'
-        if view.session_data.get(session_data_key):
+        if view.session_data.get(session_data_key) and \
+            view.get_type_by_name(cls.name) is not None:
             return
 
         struct_ref = cls.get_actual_type(view).get_struct_ref(view)
@@ -36,8 +37,15 @@ class CheckedTypedef:
 
     @classmethod
     def get_typedef_ref(cls, view: bn.BinaryView) -> bn.Type:
-        cls.define_type(view)
-        return bn.Type.named_type_from_registered_type(view, cls.name)
+        def define():
+            cls.define_type(view)
+            return bn.Type.named_type_from_registered_type(view, cls.name)
+
+        return get_registered_type(
+            view, cls, 'typedef_ref',
+            (cls.get_actual_type(view).alt_name, cls.name),
+            define,
+        )
 
     @classmethod
     def get_alignment(cls, view: bn.BinaryView) -> int:
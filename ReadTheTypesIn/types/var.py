@@ -4,7 +4,26 @@ from weakref import WeakKeyDictionary
 import binaryninja as bn
 from .resolver import resolve_type_spec
 from .annotation import DisplacementOffset, Array, Enum, NamedCheckedTypeRef
-from ..utils import get_function, get_component
+from ..utils import PerViewCache, get_function, get_component, unpack_offsets
+
+# Spelled outside CheckedTypeDataVar, whose type property shadows the builtin
+OffsetType = type[DisplacementOffset]
+
+_registered_types = PerViewCache()
+
+def get_registered_type(
+    view: bn.BinaryView,
+    owner: type,
+    kind: str,
+    names: tuple[str, ...],
+    define,
+) -> bn.Type:
+    # The types can be undone or deleted by the user, so a cached type is
+    # only reused while everything it names is still defined in the view
+    return _registered_types.get(
+        view, (owner, kind), define,
+        lambda _: all(view.get_type_by_name(name) is not None for name in names),
+    )
 
 class CheckedTypeDataVar:
     name: ClassVar[str]
@@ -13,6 +32,8 @@ class CheckedTypeDataVar:
     packed: ClassVar[bool] = False
     members: ClassVar[list[tuple[bn.Type, str]]]
     member_map: ClassVar[dict[str, bn.Type]]
+    offset_members: ClassVar[dict[str, OffsetType]]
+    offset_array_members: ClassVar[dict[str, OffsetType]]
 
     value_dependent: ClassVar[bool] = False
     virtual_relative_members: ClassVar[dict[str, bn.Type]] = {}
@@ -41,6 +62,16 @@ class CheckedTypeDataVar:
             for mtype, name in cls.members
         }
 
+        cls.offset_members = {}
+        cls.offset_array_members = {}
+        for name, mtype in cls.member_map.items():
+            if (offset_type := DisplacementOffset.get_origin(mtype)) is not None:
+                cls.offset_members[name] = offset_type
+            elif (offset_type := DisplacementOffset.get_origin(
+                Array.get_element_type(mtype)
+            )) is not None:
+                cls.offset_array_members[name] = offset_type
+
         cls._attr_map = {}
         for c in reversed(cls.__mro__):
             if c is CheckedTypeDataVar:
@@ -132,12 +163,12 @@ class CheckedTypeDataVar:
 
 
             if isinstance(member_source.type, bn.ArrayType):
+                width = member_source.type.element_type.width
+                data = self.view.read(member_source.address, member_source.type.width)
+                base = offset_type.resolve_offset(self.view, 0)
                 member_source = [
-                    offset_type.resolve_offset(
-                        self.view,
-                        offset.value
-                    )
-                    for offset in member_source
+                    base + offset
+                    for offset in unpack_offsets(self.view, data, width)
                 ]
             else:
                 member_source = offset_type.resolve_offset(
@@ -160,12 +191,15 @@ class CheckedTypeDataVar:
 
                 if isinstance(member_source.type, bn.ArrayType):
                     # TODO more checks
+                    # Element addresses are computed rather than taken from a
+                    # child accessor per element
+                    element_width = member_source.type.element_type.width
                     return [
                         target_type.create(
                             self.view,
-                            value.address,
+                            member_source.address + (i * element_width),
                         )
-                        for value in member_source
+                        for i in range(member_source.type.count)
                     ]
 
             if isinstance(member_source, int):
@@ -299,32 +333,31 @@ class CheckedTypeDataVar:
         self.mark_down_members()
 
     def mark_down_members(self):
-        for name, mtype in self.member_map.items():
-            if DisplacementOffset.get_target(mtype) is not None:
-                member = self[name]
-                if isinstance(member, CheckedTypeDataVar):
-                    if member.defined:
+        for name in self.offset_members:
+            member = self[name]
+            if isinstance(member, CheckedTypeDataVar):
+                if member.defined:
+                    continue
+
+                try:
+                    member.mark_down()
+                except Exception as e:
+                    raise ValueError(
+                        f"Failed to define {self.name}.{name} @ {member.address:x}"
+                    ) from e
+
+        for name in self.offset_array_members:
+            for element in self[name]:
+                if isinstance(element, CheckedTypeDataVar):
+                    if element.defined:
                         continue
 
                     try:
-                        member.mark_down()
+                        element.mark_down()
                     except Exception as e:
                         raise ValueError(
-                            f"Failed to define {self.name}.{name} @ {self[name].address:x}"
+                            f"Failed to define {self.name}.{name} @ {element.address:x}"
                         ) from e
-            elif DisplacementOffset.get_target(Array.get_element_type(mtype)) is not None:
-                array = self[name]
-                for element in array:
-                    if isinstance(element, CheckedTypeDataVar):
-                        if element.defined:
-                            continue
-
-                        try:
-                            element.mark_down()
-                        except Exception as e:
-                            raise ValueError(
-                                f"Failed to define {self.name}.{name} @ {self[name].address:x}"
-                            ) from e
 
     @classmethod
     def create(
@@ -424,18 +457,27 @@ class CheckedTypeDataVar:
 
     @classmethod
     def get_structure(cls, view: bn.BinaryView) -> bn.Type:
-        cls.define_structure(view)
-        return view.get_type_by_name(cls.alt_name)
+        def define():
+            cls.define_structure(view)
+            return view.get_type_by_name(cls.alt_name)
+
+        return get_registered_type(view, cls, 'structure', (cls.alt_name,), define)
 
     @classmethod
     def get_struct_ref(cls, view: bn.BinaryView) -> bn.NamedTypeReferenceType:
-        cls.define_structure(view)
-        return bn.Type.named_type_from_registered_type(view, cls.alt_name)
+        def define():
+            cls.define_structure(view)
+            return bn.Type.named_type_from_registered_type(view, cls.alt_name)
+
+        return get_registered_type(view, cls, 'struct_ref', (cls.alt_name,), define)
 
     @classmethod
     def get_typedef_ref(cls, view: bn.BinaryView) -> bn.NamedTypeReferenceType:
-        cls.define_typedef(view)
-        return bn.Type.named_type_from_registered_type(view, cls.name)
+        def define():
+            cls.define_typedef(view)
+            return bn.Type.named_type_from_registered_type(view, cls.name)
+
+        return get_registered_type(view, cls, 'typedef_ref', (cls.alt_name, cls.name), define)
 
     @classmethod
     def get_alignment(cls, view: bn.BinaryView) -> int:
@@ -1,7 +1,35 @@
+import os
+import re
+import struct
+import threading
 from functools import cache
-from typing import Generator
+from collections import defaultdict
+from weakref import WeakKeyDictionary
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generator, Iterable, Callable, Optional, Hashable, Any
 import binaryninja as bn
 
+class PerViewCache:
+    # Values are kept per view, so closing a view drops them with it
+    def __init__(self):
+        self._views: WeakKeyDictionary[bn.BinaryView, dict[Hashable, Any]] = WeakKeyDictionary()
+
+    def get(
+        self,
+        view: bn.BinaryView,
+        key: Hashable,
+        compute: Callable[[], Any],
+        is_valid: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        view_values = self._views.setdefault(view, {})
+        if (value := view_values.get(key)) is None or \
+            (is_valid is not None and not is_valid(value)):
+            value = compute()
+            view_values[key] = value
+
+        return value
+
 def get_data_sections(view: bn.BinaryView) -> Generator[bn.Section, None, None]:
     for section in view.sections.values():
         if section.semantics not in [
@@ -12,6 +40,195 @@ def get_data_sections(view: bn.BinaryView) -> Generator[bn.Section, None, None]:
 
         yield section
 
+def _scan_sections(
+    sections: Iterable[bn.Section],
+    scan_section: Callable[[bn.Section, Optional[Callable[[int, int], bool]]], None],
+    progress_func: Optional[Callable[[int, int], bool]] = None,
+):
+    # Sections are scanned concurrently, on at most one thread per CPU.
+    # Each scan reports progress within its own section; these are summed,
+    # so progress_func sees one figure for all of them
+    sections = list(sections)
+    if len(sections) == 0:
+        return
+
+    total = sum(section.end - section.start for section in sections)
+    processed = [0] * len(sections)
+    progress_lock = threading.Lock()
+
+    def get_section_progress(index: int) -> Optional[Callable[[int, int], bool]]:
+        if progress_func is None:
+            return None
+
+        def section_progress(current: int, _: int) -> bool:
+            with progress_lock:
+                processed[index] = current
+                return progress_func(sum(processed), total)
+
+        return section_progress
+
+    with ThreadPoolExecutor(max_workers=min(len(sections), os.cpu_count() or 1)) as executor:
+        list(executor.map(
+            lambda index: scan_section(sections[index], get_section_progress(index)),
+            range(len(sections)),
+        ))
+
+def find_all_data_in_sections(
+    view: bn.BinaryView,
+    sections: Iterable[bn.Section],
+    data: bytes,
+    match_callback: Callable[[int, bn.databuffer.DataBuffer], bool],
+    progress_func: Optional[Callable[[int, int], bool]] = None,
+):
+    # Only for read-only match callbacks; sections are scanned on several
+    # threads, so callbacks must not define or analyse anything in the view,
+    # and matches arrive in no particular order across sections
+    _scan_sections(
+        sections,
+        lambda section, section_progress: view.find_all_data(
+            section.start, section.end,
+            data,
+            progress_func=section_progress,
+            match_callback=match_callback,
+        ),
+        progress_func,
+    )
+
+OFFSET_FORMATS = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+@cache
+def get_offset_struct(
+    width: int,
+    endianness: bn.Endianness,
+    signed: bool = False,
+) -> struct.Struct:
+    prefix = '<' if endianness is bn.Endianness.LittleEndian else '>'
+    offset_format = OFFSET_FORMATS[width]
+    return struct.Struct(prefix + (offset_format.lower() if signed else offset_format))
+
+def unpack_offsets(
+    view: bn.BinaryView,
+    data: bytes,
+    width: int,
+    signed: bool = False,
+) -> list[int]:
+    # Decodes a whole table of offsets fetched with one view.read, instead of
+    # building an accessor per element; trailing bytes that do not make up a
+    # whole element are ignored
+    data = data[:len(data) - len(data) % width]
+    return [
+        offset
+        for (offset,) in get_offset_struct(width, view.endianness, signed).iter_unpack(data)
+    ]
+
+def get_high_byte_patterns(
+    view: bn.BinaryView,
+    values: Iterable[int],
+    width: int,
+    shift: int,
+) -> set[bytes]:
+    # Nearby values share their high bytes, so deduplicate them as integers
+    # before encoding; usually only a handful of distinct patterns remain
+    byteorder = 'little' if view.endianness is bn.Endianness.LittleEndian else 'big'
+    return {
+        high.to_bytes(width - shift, byteorder)
+        for high in {value >> (8 * shift) for value in values}
+    }
+
+SCAN_CHUNK_SIZE = 0x1000000
+
+def _compile_patterns(patterns: list[bytes], trailing: int = 0) -> re.Pattern:
+    # Patterns that only differ in their first byte are folded into one
+    # character class, so the engine tries a handful of alternatives per
+    # position rather than one per pattern; the lookahead lets matches
+    # overlap, as they can with find_all_data
+    heads_by_tail = defaultdict(set)
+    for pattern in patterns:
+        heads_by_tail[pattern[1:]].add(pattern[0])
+
+    alternatives = []
+    for tail, heads in heads_by_tail.items():
+        if len(heads) == 1:
+            head = re.escape(bytes(heads))
+        else:
+            head = b'[' + b''.join(re.escape(bytes([byte])) for byte in sorted(heads)) + b']'
+
+        alternatives.append(head + re.escape(tail))
+
+    suffix = b'.{%d}' % trailing if trailing > 0 else b''
+    return re.compile(
+        b'(?=((?:' + b'|'.join(alternatives) + b')' + suffix + b'))',
+        re.DOTALL,
+    )
+
+def find_any_data_in_sections(
+    view: bn.BinaryView,
+    sections: Iterable[bn.Section],
+    patterns: Iterable[bytes],
+    match_callback: Callable[[int, bytes], bool],
+    *,
+    progress_func: Optional[Callable[[int, int], bool]] = None,
+    trailing: int = 0,
+):
+    # Reads each section once and matches every pattern in the same pass,
+    # rather than one find_all_data sweep per pattern.
+    # The callback also receives the `trailing` bytes after each match, so
+    # nearby fields can be checked without another read from the view.
+    # Like find_all_data_in_sections, sections are scanned on several
+    # threads, so callbacks must not define or analyse anything in the view
+    patterns = list(patterns)
+    if len(patterns) == 0:
+        return
+
+    regex = _compile_patterns(patterns, trailing)
+    overlap = max(len(pattern) for pattern in patterns) + trailing - 1
+
+    def scan_section(
+        section: bn.Section,
+        section_progress: Optional[Callable[[int, int], bool]],
+    ):
+        start = section.start
+        while start < section.end:
+            end = min(start + SCAN_CHUNK_SIZE, section.end)
+            data = view.read(start, min(end + overlap, section.end) - start)
+            for match in regex.finditer(data):
+                if match.start() >= end - start:
+                    break
+
+                if not match_callback(start + match.start(), match.group(1)):
+                    return
+
+            if section_progress is not None and \
+                not section_progress(end - section.start, section.end - section.start):
+                return
+
+            start = end
+
+    _scan_sections(sections, scan_section, progress_func)
+
+def filter_function_targets(
+    view: bn.BinaryView,
+    candidates: Iterable[int],
+    get_target: Callable[[int], int],
+) -> list[int]:
+    # get_function may create functions, so candidates from the scans'
+    # callbacks are checked here, on the calling thread and in address order
+    is_function = make_function_check(view)
+    return [
+        address
+        for address in sorted(candidates)
+        if is_function(get_target(address))
+    ]
+
+@contextmanager
+def bulk_modify_symbols(view: bn.BinaryView):
+    # Defers symbol table updates (and their notifications) to the end of the block
+    view.begin_bulk_modify_symbols()
+    try:
+        yield view
+    finally:
+        view.end_bulk_modify_symbols()
+
 def get_function(view: bn.BinaryView, address: int):
     if not any(
         section.semantics == bn.SectionSemantics.ReadOnlyCodeSectionSemantics
@@ -28,8 +245,25 @@ def get_function(view: bn.BinaryView, address: int):
     view.add_function(address, auto_discovered=True)
     return view.get_recent_function_at(address)
 
-@cache
+def make_function_check(view: bn.BinaryView) -> Callable[[int], bool]:
+    # Many records share a target (the same copy or unwind function, or
+    # none at all), so each address is only looked up once
+    checked = {}
+    def is_function(address: int) -> bool:
+        if (result := checked.get(address)) is None:
+            result = get_function(view, address) is not None
+            checked[address] = result
+
+        return result
+
+    return is_function
+
+_components = PerViewCache()
+
 def get_component(view: bn.BinaryView, name: tuple[str]):
+    return _components.get(view, name, lambda: _get_component(view, name))
+
+def _get_component(view: bn.BinaryView, name: tuple[str]):
     if len(name) == 1:
         parent = view.root_component
         if name[0].startswith("<lambda_"):